@@ -1,6 +1,8 @@
+import io
 import os
 import re
 import sys
+from functools import lru_cache
 
 # --- Configuration: Add Library Path ---
 # VENV_PATH will be replaced during installation by Makefile
@@ -30,40 +32,71 @@ if not site_packages_path:
 if site_packages_path not in sys.path:
     sys.path.insert(0, site_packages_path)
 
+# rawpy / exifread are imported lazily on the RAW paths to keep startup light
 try:
-    import exifread
-    import rawpy
     from PIL import ExifTags, Image, ImageDraw, ImageFont
 except ImportError as e:
     print(f"Error loading libraries: {e}")
     sys.exit(1)
 
+# Optional: libjpeg-turbo's TurboJPEG API for the final encode (falls back to Pillow)
+try:
+    import numpy as np
+    from turbojpeg import TJPF_RGB, TJSAMP_422, TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+MAX_APP1_PAYLOAD = 0xFFFF - 2  # JPEG segment length field includes its own 2 bytes
+
 # --- Exif Logic ---
+# Only the tags create_exif_string / open_image actually read
+_NEEDED_EXIF_TAGS = {
+    271: "Make", 272: "Model", 274: "Orientation", 33434: "ExposureTime", 33437: "FNumber",
+    34855: "ISOSpeedRatings", 37386: "FocalLength", 42036: "LensModel",
+}
+
+RAW_HEADER_BYTES = 128 * 1024
+# Tags create_exif_string relies on; if any is missing or empty in the header parse, read the whole file
+RAW_REQUIRED_TAGS = ("Image Make", "Image Model", "EXIF LensModel", "EXIF FocalLength",
+                     "EXIF FNumber", "EXIF ExposureTime", "EXIF ISOSpeedRatings")
+
 def get_exif_data_pillow(image):
     exif_data = {}
     info = image.getexif()
     if not info: return exif_data
-    for tag, value in info.items():
-        decoded = ExifTags.TAGS.get(tag, tag)
-        exif_data[decoded] = value
-    if not exif_data.get("FNumber"):
-        try:
-            info_legacy = image._getexif()
-            if info_legacy:
-                for tag, value in info_legacy.items():
-                    decoded = ExifTags.TAGS.get(tag, tag)
-                    exif_data[decoded] = value
-        except: pass
+    # Make/Model/Orientation sit in IFD0, exposure and lens tags in the Exif sub-IFD;
+    # read just those two instead of the legacy merged parse (which also walks GPS)
+    try: exif_ifd = info.get_ifd(ExifTags.IFD.Exif)
+    except Exception: exif_ifd = {}
+    for tag, name in _NEEDED_EXIF_TAGS.items():
+        if tag in info: exif_data[name] = info[tag]
+        elif tag in exif_ifd: exif_data[name] = exif_ifd[tag]
     return exif_data
 
 def get_exif_data_raw(file_path):
+    import exifread
+    # EXIF sits in the RAW header; try the first chunk before reading the whole file
     try:
         with open(file_path, "rb") as f:
-            tags = exifread.process_file(f, details=False)
-    except:
-        return {}
+            header = f.read(RAW_HEADER_BYTES)
+        tags = exifread.process_file(io.BytesIO(header), details=False, stop_tag="LensModel")
+    except Exception: tags = {}
+    if any(not str(tags.get(k, "")).strip() for k in RAW_REQUIRED_TAGS):
+        try:
+            with open(file_path, "rb") as f:
+                tags = exifread.process_file(f, details=False, stop_tag="LensModel")
+        except Exception:
+            return {}
     data = {}
+    # Index each tag by full key ("EXIF FNumber") and bare name ("FNumber") once
+    index = {}
+    for k, v in tags.items():
+        index.setdefault(k, v)
+        index.setdefault(k.rsplit(" ", 1)[-1], v)
     def get_tag_val(search_keys):
+        for sk in search_keys:
+            if sk in index: return index[sk]
+        # Vendor-specific names: fall back to a substring scan
         for k in tags:
             for sk in search_keys:
                 if sk in k: return tags[k]
@@ -103,19 +136,25 @@ def format_shutter_speed(speed, speed_str=None):
         return ""
     return f"{speed}"
 
+_JUNK_RE = re.compile(r"\s*(?:CORPORATION|Inc\.|Ltd\.)\s*", re.IGNORECASE)
+
+@lru_cache(maxsize=64)
+def _make_patterns(make):
+    first_word = make.split()[0]
+    pattern = re.compile(re.escape(make), re.IGNORECASE)
+    pattern_fw = re.compile(re.escape(first_word), re.IGNORECASE) if first_word else None
+    return pattern, pattern_fw
+
 def create_exif_string(exif):
     raw_model = str(exif.get("Model", "Unknown Camera")).strip()
     make = str(exif.get("Make", "")).strip()
     model_clean = raw_model
     if make:
-        pattern = re.compile(re.escape(make), re.IGNORECASE)
+        pattern, pattern_fw = _make_patterns(make)
         model_clean = pattern.sub("", model_clean).strip()
-        first_word = make.split()[0]
-        if first_word:
-            pattern_fw = re.compile(re.escape(first_word), re.IGNORECASE)
+        if pattern_fw:
             model_clean = pattern_fw.sub("", model_clean).strip()
-    for junk in ["CORPORATION", "Corporation", "Inc.", "Ltd."]:
-        model_clean = model_clean.replace(junk, "").strip()
+    model_clean = _JUNK_RE.sub(" ", model_clean).strip()
     if not model_clean: model_clean = raw_model
     simple_make = make.split()[0].title() if make else ""
     if simple_make and simple_make.lower() not in model_clean.lower():
@@ -131,35 +170,79 @@ def create_exif_string(exif):
     exposure_time = exif.get("ExposureTime", 0)
     exposure_time_str = exif.get("ExposureTimeString", None)
     try: fl_str = f"{int(focal_length)}mm" if focal_length else ""
-    except: fl_str = f"{focal_length}mm"
+    except (TypeError, ValueError): fl_str = f"{focal_length}mm"
     try: fn_str = f"f/{f_number}" if f_number else ""
-    except: fn_str = f"f/{f_number}"
+    except (TypeError, ValueError): fn_str = f"f/{f_number}"
     ss_str = f"{format_shutter_speed(exposure_time, exposure_time_str)}s" if (exposure_time or exposure_time_str) else ""
     iso_str = f"ISO {iso}" if iso else ""
     settings_parts = [p for p in [fl_str, fn_str, ss_str, iso_str] if p]
     settings_str = " | ".join(settings_parts)
     return top_text, settings_str
 
+def decode_jpeg_turbo(file_path, img):
+    # Pixels from the process-wide TurboJPEG handle; metadata (info["exif"]) from Pillow's header parse
+    try:
+        with open(file_path, "rb") as f:
+            decoded = Image.fromarray(_turbo_jpeg.decode(f.read(), pixel_format=TJPF_RGB))
+    except Exception: return img  # e.g. CMYK JPEGs: let Pillow decode
+    decoded.info = dict(img.info)
+    return decoded
+
 def open_image(file_path):
     ext = os.path.splitext(file_path)[1].lower()
     if ext in [".jpg", ".jpeg", ".png", ".tif", ".tiff"]:
         img = Image.open(file_path)
         exif = get_exif_data_pillow(img)
-        try:
-            from PIL import ImageOps
-            img = ImageOps.exif_transpose(img)
-        except: pass
+        if _turbo_jpeg is not None and ext in (".jpg", ".jpeg"):
+            img = decode_jpeg_turbo(file_path, img)
+        # exif_transpose copies the image even for identity orientation; skip it then
+        if exif.get("Orientation", 1) != 1:
+            try:
+                from PIL import ImageOps
+                img = ImageOps.exif_transpose(img)
+            except Exception: pass
         return img, exif
     if ext in [".arw", ".cr2", ".cr3", ".nef", ".dng", ".raf", ".orf"]:
+        import rawpy
         try:
             with rawpy.imread(file_path) as raw:
                 rgb = raw.postprocess(use_camera_wb=True)
                 img = Image.fromarray(rgb)
                 exif = get_exif_data_raw(file_path)
                 return img, exif
-        except: return None, {}
+        except Exception: return None, {}
     return None, {}
 
+@lru_cache(maxsize=32)
+def load_font(name, size):
+    candidates = {
+        "Bold": ["/System/Library/Fonts/SFNS-Bold.ttf", "/Library/Fonts/Arial Bold.ttf", "Arial Bold.ttf"],
+        "Regular": ["/System/Library/Fonts/SFNS.ttf", "/Library/Fonts/Arial.ttf", "Arial.ttf"]
+    }
+    search_list = candidates.get(name, []) + candidates["Regular"]
+    for fpath in search_list:
+        # Bare names are resolved by Pillow's font search; only absolute paths can be pre-checked
+        if os.path.isabs(fpath) and not os.path.exists(fpath): continue
+        try: return ImageFont.truetype(fpath, size)
+        except (OSError, ValueError): continue
+    return ImageFont.load_default()
+
+def save_jpeg(img, output_path, exif=None):
+    # APP1 segment length is 16-bit and neither encoder can split EXIF, so drop oversized blocks;
+    # Pillow also rejects exif=None, hence the empty bytes
+    if not exif or len(exif) > MAX_APP1_PAYLOAD:
+        exif = b""
+    if _turbo_jpeg is not None:
+        data = _turbo_jpeg.encode(np.asarray(img.convert("RGB")), quality=95, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_422)
+        if exif:
+            # Splice the original EXIF in as an APP1 segment after the JFIF APP0 segment
+            pos = 4 + int.from_bytes(data[4:6], "big") if data[2:4] == b"\xff\xe0" else 2
+            data = data[:pos] + b"\xff\xe1" + (len(exif) + 2).to_bytes(2, "big") + exif + data[pos:]
+        with open(output_path, "wb") as f: f.write(data)
+        return
+    # Single-pass baseline encode: no Huffman optimisation pass, 4:2:2 chroma
+    img.save(output_path, "JPEG", quality=95, optimize=False, progressive=False, subsampling=1, exif=exif)
+
 def add_frame(image_path):
     img, exif = open_image(image_path)
     if img is None: return None
@@ -180,32 +263,27 @@ def add_frame(image_path):
 
     new_width = width + (border_uniform * 2)
     new_height = height + border_uniform + border_bottom
-    new_img = Image.new("RGB", (new_width, new_height), bg_color)
+    # Uninitialised canvas: the image covers the centre, so only the four border bands need filling
+    new_img = Image.new("RGB", (new_width, new_height), None)
     new_img.paste(img, (border_uniform, border_uniform))
+    inner_bottom = border_uniform + height
+    for band in [(0, 0, new_width, border_uniform), (0, inner_bottom, new_width, new_height),
+                 (0, border_uniform, border_uniform, inner_bottom), (border_uniform + width, border_uniform, new_width, inner_bottom)]:
+        new_img.paste(bg_color, band)
     draw = ImageDraw.Draw(new_img)
 
     if camera_text or settings_text:
         available_h = border_bottom
         font_size_main = int(available_h * 0.25)
         font_size_sub = int(available_h * 0.18)
-        def load_font(name, size):
-            candidates = {
-                "Bold": ["/System/Library/Fonts/SFNS-Bold.ttf", "/Library/Fonts/Arial Bold.ttf", "Arial Bold.ttf"],
-                "Regular": ["/System/Library/Fonts/SFNS.ttf", "/Library/Fonts/Arial.ttf", "Arial.ttf"]
-            }
-            search_list = candidates.get(name, []) + candidates["Regular"]
-            for fpath in search_list:
-                try: return ImageFont.truetype(fpath, size)
-                except: continue
-            return ImageFont.load_default()
         font_main = load_font("Bold", font_size_main)
         font_sub = load_font("Regular", font_size_sub)
         center_x = new_width // 2
         settings_clean = settings_text.replace(" | ", "   ")
-        bbox_main = draw.textbbox((0, 0), camera_text, font=font_main)
+        bbox_main = font_main.getbbox(camera_text)
         h_main = bbox_main[3] - bbox_main[1]
         w_main = bbox_main[2] - bbox_main[0]
-        bbox_sub = draw.textbbox((0, 0), settings_clean, font=font_sub)
+        bbox_sub = font_sub.getbbox(settings_clean)
         h_sub = bbox_sub[3] - bbox_sub[1]
         w_sub = bbox_sub[2] - bbox_sub[0]
         gap = int(h_main * 0.4)
@@ -217,7 +295,7 @@ def add_frame(image_path):
 
     root, ext = os.path.splitext(image_path)
     output_path = f"{root}_framed.jpg"
-    new_img.save(output_path, quality=95, exif=img.info.get("exif"))
+    save_jpeg(new_img, output_path, img.info.get("exif"))
     return output_path
 
 def main():
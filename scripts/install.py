@@ -5,35 +5,79 @@ Supports both macOS and Windows, automatically detecting the platform
 and using the appropriate installation paths and commands.
 """
 
+from __future__ import annotations
+
+import argparse
 import os
-import platform
-import re
-import shutil
-import subprocess
 import sys
+from functools import cache
 from pathlib import Path
 
+# json/subprocess are imported inside the functions that need them to keep
+# usage/uninstall startup light; sys.platform avoids importing platform at all
+SYSTEM = {"darwin": "Darwin", "win32": "Windows"}.get(sys.platform, sys.platform)
+IS_WINDOWS = SYSTEM == "Windows"
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+REQUIRED_LIBRARIES = ("PIL", "rawpy", "exifread")
+
+# Interactive menu: choice -> (--target name, label, scripts to install)
+INSTALL_CHOICES = {
+    "1": ("exif-free", "Free version", ("add_exif_frame_dv_lite.py",)),
+    "2": ("exif-studio", "Studio version", ("add_exif_frame_dv.py",)),
+}
+INSTALL_TARGETS = {target: scripts for target, _, scripts in INSTALL_CHOICES.values()}
+
+# Template line in each script, rewritten with the real site-packages path on install
+VENV_PLACEHOLDER = b'VENV_PATH = "{{VENV_PATH}}"'
+
+# Runs inside the uv environment; reports Python version, site-packages and library availability as JSON
+VENV_PROBE_SCRIPT = f"""
+import json, platform, sysconfig
+out = {{"python": platform.python_version(), "site_packages": sysconfig.get_paths()["purelib"], "libraries": {{}}}}
+for lib in {REQUIRED_LIBRARIES!r}:
+    try:
+        __import__(lib)
+        out["libraries"][lib] = True
+    except Exception:
+        out["libraries"][lib] = False
+print(json.dumps(out))
+"""
+
 
+@cache
 def get_install_dir() -> Path:
     """Get DaVinci Resolve scripts installation directory for the current platform."""
-    system = platform.system()
-
-    if system == "Darwin":  # macOS
+    if SYSTEM == "Darwin":  # macOS
         return Path.home() / "Library/Application Support/Blackmagic Design/DaVinci Resolve/Fusion/Scripts/Utility"
-    elif system == "Windows":
+    elif IS_WINDOWS:
         appdata = os.environ.get("APPDATA")
         if not appdata:
             raise RuntimeError("APPDATA environment variable not found")
         return Path(appdata) / "Blackmagic Design/DaVinci Resolve/Fusion/Scripts/Utility"
     else:
-        raise RuntimeError(f"Unsupported platform: {system}")
+        raise RuntimeError(f"Unsupported platform: {SYSTEM}")
 
 
+@cache
 def get_venv_site_packages() -> str:
     """Get site-packages path from the current virtual environment."""
+    import subprocess
+
+    # Fast path: read the project's .venv layout directly (no subprocess). Only taken when
+    # the layout is unambiguous and the venv is not older than the project metadata;
+    # otherwise let `uv run` pick the interpreter and sync the environment first.
+    venv_dir = PROJECT_DIR / ".venv"
+    candidates = list(venv_dir.glob("Lib/site-packages" if IS_WINDOWS else "lib/python*/site-packages"))
+    if len(candidates) == 1:
+        synced_at = candidates[0].stat().st_mtime
+        metadata = [PROJECT_DIR / name for name in ("pyproject.toml", "uv.lock")]
+        if all(not path.exists() or path.stat().st_mtime <= synced_at for path in metadata):
+            return str(candidates[0])
+
     try:
         result = subprocess.run(
-            ["uv", "run", "python", "-c", "import sys; print([p for p in sys.path if 'site-packages' in p][0] if any('site-packages' in p for p in sys.path) else '')"],
+            ["uv", "run", "python", "-c", "import sysconfig; print(sysconfig.get_paths()['purelib'])"],
             capture_output=True,
             text=True,
             check=True,
@@ -46,65 +90,94 @@ def get_venv_site_packages() -> str:
         raise RuntimeError(f"Failed to detect site-packages: {e}")
 
 
+def probe_venv() -> dict:
+    """Inspect the virtual environment (Python, site-packages, libraries) in a single subprocess."""
+    import json
+    import subprocess
+
+    try:
+        result = subprocess.run(
+            ["uv", "run", "python", "-c", VENV_PROBE_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(result.stdout)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to inspect virtual environment (uv exited with {e.returncode})") from e
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"Failed to inspect virtual environment: {e}") from e
+
+
 def check_environment() -> dict:
     """Check Python, uv, virtual environment, and required libraries."""
+    import subprocess
+
     print("=== Environment Check ===")
     print()
 
     checks = {"python": False, "uv": False, "venv": False, "libraries": {}}
 
-    # Check Python
+    # A successful `uv run python` probe proves uv, Python and the venv in one spawn
     print("1. Checking Python and uv...")
     try:
-        python_version = subprocess.run(
-            ["python3" if platform.system() != "Windows" else "python", "--version"],
-            capture_output=True,
-            text=True,
-            check=True,
-        ).stdout.strip()
-        print(f"✓ Python found: {python_version}")
-        checks["python"] = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("✗ Python not found")
-        return checks
+        venv_info = probe_venv()
+        venv_error = None
+    except RuntimeError as e:
+        venv_info = None
+        venv_error = e
 
-    try:
-        uv_version = subprocess.run(
-            ["uv", "--version"],
-            capture_output=True,
-            text=True,
-            check=True,
-        ).stdout.strip()
-        print(f"✓ uv found: {uv_version}")
+    if venv_info is not None:
+        print(f"✓ Python found: Python {venv_info['python']}")
+        print("✓ uv found")
+        checks["python"] = True
         checks["uv"] = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("✗ uv not found (required for installation)")
-        return checks
+    else:
+        # Probe failed: check the tools separately to tell which one is missing
+        try:
+            python_version = subprocess.run(
+                ["python" if IS_WINDOWS else "python3", "--version"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            print(f"✓ Python found: {python_version}")
+            checks["python"] = True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            print("✗ Python not found")
+            return checks
+
+        try:
+            uv_version = subprocess.run(
+                ["uv", "--version"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            print(f"✓ uv found: {uv_version}")
+            checks["uv"] = True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            print("✗ uv not found (required for installation)")
+            return checks
 
     # Check virtual environment and libraries
     print()
     print("2. Checking virtual environment and libraries...")
-    try:
-        site_packages = get_venv_site_packages()
-        print(f"✓ Virtual environment found: {site_packages}")
-        checks["venv"] = True
-        checks["site_packages"] = site_packages
-    except RuntimeError as e:
-        print(f"✗ {e}")
+    site_packages = venv_info["site_packages"] if venv_info else ""
+    if not site_packages:
+        print(f"✗ {venv_error or 'Could not detect site-packages path'}")
         print("   Please run 'uv sync' to create virtual environment")
         return checks
+    print(f"✓ Virtual environment found: {site_packages}")
+    checks["venv"] = True
+    checks["site_packages"] = site_packages
 
     print()
-    for lib in ["PIL", "rawpy", "exifread"]:
-        try:
-            subprocess.run(
-                ["uv", "run", "python", "-c", f"import {lib}"],
-                capture_output=True,
-                check=True,
-            )
+    for lib in REQUIRED_LIBRARIES:
+        if venv_info["libraries"].get(lib):
             print(f"✓ {lib} installed")
             checks["libraries"][lib] = True
-        except subprocess.CalledProcessError:
+        else:
             print(f"✗ {lib} not found (run 'uv sync')")
             checks["libraries"][lib] = False
 
@@ -123,38 +196,42 @@ def check_environment() -> dict:
     return checks
 
 
-def install_script(script_path: Path, install_dir: Path, site_packages: str):
+def install_script(script_path: str, install_dir: str, site_packages: str):
     """Install a single script with site-packages path embedded."""
-    # Read source script
-    content = script_path.read_text(encoding="utf-8")
+    import json
+
+    # Read source script as bytes: the placeholder is ASCII, so no decode/encode round-trip
+    with open(script_path, "rb") as f:
+        content = f.read()
 
-    # Replace template placeholder with actual path
-    # Match: VENV_PATH = "{{VENV_PATH}}"
-    pattern = r'^VENV_PATH = "{{VENV_PATH}}"$'
-    replacement = f'VENV_PATH = "{site_packages}"'
-    modified_content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
+    # Replace template placeholder with actual path (literal swap, no regex)
+    # json.dumps yields a valid double-quoted ASCII literal, escaping Windows backslashes
+    replacement = f"VENV_PATH = {json.dumps(site_packages)}".encode("ascii")
+    modified_content = content.replace(VENV_PLACEHOLDER, replacement, 1)
 
     # Write to install directory
-    target_path = install_dir / script_path.name
-    target_path.write_text(modified_content, encoding="utf-8")
-    print(f"Installed: {script_path.name}")
+    script_name = os.path.basename(script_path)
+    with open(os.path.join(install_dir, script_name), "wb") as f:
+        f.write(modified_content)
+    print(f"Installed: {script_name}")
 
 
-def install():
-    """Interactive installation of DaVinci Resolve scripts."""
-    print("Select scripts to install:")
-    print("  1) Free version (add_exif_frame_dv_lite.py)")
-    print("  2) Studio version (add_exif_frame_dv.py)")
+def install(target: str | None = None):
+    """Install DaVinci Resolve scripts, prompting for the version unless a target is given."""
+    if target is not None:
+        scripts = INSTALL_TARGETS[target]
+    else:
+        print("Select scripts to install:")
+        for key, (_, label, scripts) in INSTALL_CHOICES.items():
+            print(f"  {key}) {label} ({', '.join(scripts)})")
 
-    choice = input("Enter choice [1-2]: ").strip()
+        choice = input(f"Enter choice [1-{len(INSTALL_CHOICES)}]: ").strip()
 
-    if choice == "1":
-        scripts = ["add_exif_frame_dv_lite.py"]
-    elif choice == "2":
-        scripts = ["add_exif_frame_dv.py"]
-    else:
-        print("Invalid choice")
-        sys.exit(1)
+        entry = INSTALL_CHOICES.get(choice)
+        if entry is None:
+            print("Invalid choice")
+            sys.exit(1)
+        _, _, scripts = entry
 
     # Get site-packages path
     try:
@@ -170,14 +247,15 @@ def install():
     install_dir = get_install_dir()
     install_dir.mkdir(parents=True, exist_ok=True)
 
-    # Install selected scripts
-    scripts_dir = Path(__file__).parent
+    # Install selected scripts (plain string paths; one stat per script)
+    install_dir_s = str(install_dir)
+    scripts_dir_s = os.path.dirname(os.path.abspath(__file__))
     for script_name in scripts:
-        script_path = scripts_dir / script_name
-        if not script_path.exists():
+        script_path = os.path.join(scripts_dir_s, script_name)
+        if not os.path.isfile(script_path):
             print(f"ERROR: Script not found: {script_path}")
             sys.exit(1)
-        install_script(script_path, install_dir, site_packages)
+        install_script(script_path, install_dir_s, site_packages)
 
     print("Installation complete. Please restart DaVinci Resolve if scripts do not appear.")
 
@@ -186,18 +264,20 @@ def uninstall():
     """Remove installed scripts from DaVinci Resolve."""
     install_dir = get_install_dir()
 
-    scripts_to_remove = [
-        "add_exif_frame_dv.py",
-        "add_exif_frame_dv_lite.py",
-    ]
+    scripts_to_remove = {name for scripts in INSTALL_TARGETS.values() for name in scripts}
+
+    # One directory listing instead of a stat per known script
+    try:
+        with os.scandir(install_dir) as it:
+            matches = [entry for entry in it if entry.name in scripts_to_remove and entry.is_file()]
+    except FileNotFoundError:
+        matches = []
 
     removed_count = 0
-    for script_name in scripts_to_remove:
-        script_path = install_dir / script_name
-        if script_path.exists():
-            script_path.unlink()
-            print(f"Removed: {script_name}")
-            removed_count += 1
+    for entry in sorted(matches, key=lambda e: e.name):
+        os.unlink(entry.path)
+        print(f"Removed: {entry.name}")
+        removed_count += 1
 
     if removed_count > 0:
         print(f"Removed {removed_count} script(s) from {install_dir}")
@@ -207,26 +287,29 @@ def uninstall():
 
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage:")
-        print("  python scripts/install.py install    - Install scripts")
-        print("  python scripts/install.py uninstall  - Remove scripts")
-        print("  python scripts/install.py check      - Check environment")
-        sys.exit(1)
-
-    command = sys.argv[1]
-
-    if command == "install":
-        install()
-    elif command == "uninstall":
+    parser = argparse.ArgumentParser(prog="python scripts/install.py", description="Install DaVinci Resolve scripts.")
+    subparsers = parser.add_subparsers(dest="command")
+    install_parser = subparsers.add_parser("install", help="Install scripts")
+    install_parser.add_argument(
+        "--target",
+        choices=list(INSTALL_TARGETS),
+        help="Script to install without prompting (default: interactive menu)",
+    )
+    subparsers.add_parser("uninstall", help="Remove scripts")
+    subparsers.add_parser("check", help="Check environment")
+    args = parser.parse_args()
+
+    if args.command == "install":
+        install(args.target)
+    elif args.command == "uninstall":
         uninstall()
-    elif command == "check":
+    elif args.command == "check":
         checks = check_environment()
         # Exit with error if critical checks failed
         if not all([checks.get("python"), checks.get("uv"), checks.get("venv")]):
             sys.exit(1)
     else:
-        print(f"Unknown command: {command}")
+        parser.print_help()
         sys.exit(1)
 
 